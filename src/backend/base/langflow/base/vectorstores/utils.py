@@ -1,5 +1,32 @@
+import atexit
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from itertools import count, islice
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+import numpy as np
+from diskcache import Cache
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+from platformdirs import user_cache_dir
+
 from langflow.schema import Data
 
+EMBEDDINGS_CACHE_DIR = Path(user_cache_dir("langflow", "langflow")) / "embeddings"
+
+_embeddings_cache: Cache | None = None
+# fields named with any of these words hold credentials, which do not change the vectors
+_SECRET_FIELD_PARTS = {"key", "token", "secret", "password", "credential", "credentials"}
+
+# cassio.init replaces a process-wide default session
+_cassio_init_lock = threading.Lock()
+
 
 def chroma_collection_to_data(collection_dict: dict):
     """
@@ -22,3 +49,533 @@ def chroma_collection_to_data(collection_dict: dict):
                 data_dict[key] = value
         data.append(Data(**data_dict))
     return data
+
+
+def _data_payload(data: Data) -> tuple[str, dict]:
+    metadata = data.data.copy()
+    text = metadata.pop(data.text_key, data.default_value)
+    # validated like the page_content of the Document that to_lc_document would build
+    if not isinstance(text, str):
+        if not isinstance(text, (int, float, Decimal)):
+            raise ValueError(
+                f"The text of a Data must be a string, got {type(text).__name__} under the key '{data.text_key}'."
+            )
+        text = str(text)
+    return text, metadata
+
+
+def _document_payload(document: Document) -> tuple[str, dict]:
+    return document.page_content, document.metadata or {}
+
+
+def _converted_document_payload(data: Data) -> tuple[str, dict]:
+    return _document_payload(data.to_lc_document())
+
+
+def data_to_payloads(inputs: Iterable) -> Iterator[tuple[str, dict]]:
+    """
+    Lazily converts ingested inputs to the (text, metadata) pairs written to a vector store.
+
+    Data inputs are split into their text and the rest of their data, the same way to_lc_document does, but
+    without building an intermediate Document. Data subclasses overriding to_lc_document still go through it.
+    The converter is looked up once per input type instead of testing every input.
+
+    Args:
+        inputs: The Data objects or documents to convert.
+
+    Returns:
+        Iterator[tuple[str, dict]]: The text and metadata of each input, in the order of the inputs.
+    """
+    converters: dict[type, Callable] = {}
+    for _input in inputs:
+        input_type = type(_input)
+        converter = converters.get(input_type)
+        if converter is None:
+            if not issubclass(input_type, Data):
+                converter = _document_payload
+            elif input_type.to_lc_document is Data.to_lc_document:
+                converter = _data_payload
+            else:
+                converter = _converted_document_payload
+            converters[input_type] = converter
+        yield converter(_input)
+
+
+def merge_search_results(results: Iterable[list[tuple[Document, float]]], k: int) -> list[Document]:
+    """
+    Merges the scored results of several searches into the k best distinct documents.
+
+    Args:
+        results: The (document, score) pairs returned by each search, higher scores being better.
+        k (int): Number of documents to return.
+
+    Returns:
+        list[Document]: The k documents with the highest scores, each document appearing once.
+    """
+    # imported on first use, as importing numba would add to the cold start of every vector store component
+    from langflow.utils.topk_numba import topk
+
+    best: dict[str, tuple[Document, float]] = {}
+    for docs_and_scores in results:
+        for doc, score in docs_and_scores:
+            if doc.page_content not in best or score > best[doc.page_content][1]:
+                best[doc.page_content] = (doc, score)
+
+    candidates = list(best.values())
+    scores = np.array([score for _, score in candidates], dtype=np.float64)
+    return [candidates[i][0] for i in topk(scores, k)]
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Yields lists of up to size consecutive items of the iterable, without materializing it."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def adaptive_batch_size(
+    texts: list[str],
+    max_batch_bytes: int,
+    row_overhead_bytes: int = 0,
+    min_size: int = 8,
+    max_size: int = 1000,
+    sample_size: int = 32,
+) -> int:
+    """
+    Picks how many rows to write per request so that a request carries about max_batch_bytes.
+
+    The size of a row is estimated from the average length of the first sample_size texts, plus a fixed
+    overhead for the vector and metadata.
+
+    Args:
+        texts (list[str]): The texts of the rows to write.
+        max_batch_bytes (int): The target payload of a single request.
+        row_overhead_bytes (int): Estimated size of a row besides its text.
+        min_size (int): Lower bound of the batch size.
+        max_size (int): Upper bound of the batch size.
+        sample_size (int): Number of texts the average length is computed from.
+
+    Returns:
+        int: The number of rows per batch, between min_size and max_size.
+    """
+    sample = texts[:sample_size]
+    if not sample:
+        return min_size
+    avg_row_bytes = sum(len(text) for text in sample) / len(sample) + row_overhead_bytes
+    return int(max(min_size, min(max_size, max_batch_bytes // max(avg_row_bytes, 1))))
+
+
+def quantize_int8(vectors) -> np.ndarray:
+    """
+    Quantizes embedding vectors to int8 with a symmetric per-vector scale.
+
+    The scale is not kept: cosine similarity is invariant to the norm of each vector, so the quantized
+    vectors can be compared directly.
+
+    Args:
+        vectors: A sequence of embedding vectors of the same dimension.
+
+    Returns:
+        np.ndarray: An int8 array of shape (len(vectors), dimension).
+    """
+    vecs = np.asarray(vectors, dtype=np.float32)
+    scale = np.abs(vecs).max(axis=1, keepdims=True) / 127.0
+    scale[scale == 0] = 1.0
+    return np.round(vecs / scale).astype(np.int8)
+
+
+def _get_embeddings_cache() -> Cache:
+    global _embeddings_cache
+    if _embeddings_cache is None:
+        _embeddings_cache = Cache(str(EMBEDDINGS_CACHE_DIR))
+    return _embeddings_cache
+
+
+def _is_config_value(value: Any) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def embedding_namespace(embedding: Embeddings) -> str | None:
+    """
+    Identifies the vector space of an embedding model, as the same text embeds differently for every model.
+
+    The namespace is derived from every non-secret field of the embeddings, not only the model name, since the
+    deployment, endpoint or output dimensions change the vectors too. Secrets and objects such as HTTP clients
+    are left out.
+
+    Args:
+        embedding (Embeddings): The embedding model.
+
+    Returns:
+        str | None: The namespace, or None when the embeddings expose no configuration to identify them by,
+        in which case their vectors and search results must not be cached.
+    """
+    fields = getattr(type(embedding), "model_fields", None) or getattr(type(embedding), "__fields__", None)
+    config = {}
+    for name in fields or []:
+        if _SECRET_FIELD_PARTS.intersection(name.lower().split("_")):
+            continue
+        value = getattr(embedding, name, None)
+        if _is_config_value(value):
+            config[name] = value
+    if not config:
+        return None
+
+    digest = hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=16).hexdigest()
+    return f"{type(embedding).__module__}.{type(embedding).__qualname__}:{digest}"
+
+
+def _embedding_cache_key(namespace: str, text: str) -> bytes:
+    # vectors are cached as raw float32 bytes
+    return hashlib.blake2b(f"{namespace}:float32\0{text}".encode(), digest_size=16).digest()
+
+
+def embed_documents_cached(embedding: Embeddings, texts: list[str]) -> np.ndarray:
+    """
+    Embeds texts, reusing the vectors of texts that were already embedded with the same model.
+
+    Duplicate texts are embedded once and the vectors are persisted in an on-disk cache, so only
+    texts never seen before are sent to the embedding model, in a single embed_documents call.
+    Embeddings that embedding_namespace cannot identify skip the on-disk cache.
+
+    Args:
+        embedding (Embeddings): The embedding model.
+        texts (list[str]): The texts to embed.
+
+    Returns:
+        np.ndarray: A contiguous float32 array with one row per text, in the order of the texts.
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    namespace = embedding_namespace(embedding)
+    if namespace is None:
+        unique_texts = list(dict.fromkeys(texts))
+        embedded = np.asarray(embedding.embed_documents(unique_texts), dtype=np.float32)
+        rows = {text: i for i, text in enumerate(unique_texts)}
+        return np.ascontiguousarray(embedded[[rows[text] for text in texts]])
+
+    cache = _get_embeddings_cache()
+    keys = [_embedding_cache_key(namespace, text) for text in texts]
+    vectors: dict[bytes, np.ndarray] = {}
+    missing: dict[bytes, str] = {}
+    for key, text in zip(keys, texts):
+        if key in vectors or key in missing:
+            continue
+        cached = cache.get(key)
+        if cached is None:
+            missing[key] = text
+        else:
+            vectors[key] = np.frombuffer(cached, dtype=np.float32)
+
+    if missing:
+        embedded = np.asarray(embedding.embed_documents(list(missing.values())), dtype=np.float32)
+        for key, vector in zip(missing, embedded):
+            cache.set(key, vector.tobytes())
+            vectors[key] = vector
+    return np.stack([vectors[key] for key in keys])
+
+
+class _SharedRegistry:
+    """
+    Bounded registry of objects shared across component builds, such as clients and vector stores.
+
+    Each key is built once, under a lock of its own so a slow connection to one cluster does not hold up the
+    others. When full, the least recently used object is evicted and closed.
+    """
+
+    def __init__(self, max_entries: int, close: Callable[[Any], None]):
+        self.max_entries = max_entries
+        self._close = close
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._build_locks: dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: Hashable) -> Any | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                return value
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                value = self._get(key)
+            if value is not None:
+                return value
+            try:
+                value = build()
+            finally:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+
+        evicted = []
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[1])
+        for old_value in evicted:
+            self._close_quietly(old_value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            values = list(self._entries.values())
+            self._entries.clear()
+        for value in values:
+            self._close_quietly(value)
+
+    def _close_quietly(self, value: Any) -> None:
+        try:
+            self._close(value)
+        except Exception:
+            logger.opt(exception=True).debug(f"Error closing evicted {type(value).__name__}.")
+
+
+def get_shared_vector_store(key: Hashable, build: Callable[[], Any]) -> Any:
+    """
+    Returns the vector store built for the given key, building it on first use.
+
+    Vector stores hold their database session, schema setup and prepared statements, so sharing them across
+    component builds saves the round trips needed to recreate them. At most 32 vector stores are kept, the
+    cluster connection of the least recently used one is shut down to make room for a new one.
+
+    Args:
+        key (Hashable): Identifies everything the built vector store depends on, credentials included.
+        build (Callable[[], Any]): Builds the vector store when none is shared for the key yet.
+
+    Returns:
+        The shared vector store.
+    """
+    return _shared_vector_stores.get_or_build(key, build)
+
+
+def _shutdown_session(vector_store: Any) -> None:
+    session = getattr(vector_store, "session", None)
+    cluster = getattr(session, "cluster", None)
+    if cluster is not None:
+        cluster.shutdown()
+    elif session is not None:
+        session.shutdown()
+
+
+_shared_vector_stores = _SharedRegistry(max_entries=32, close=_shutdown_session)
+atexit.register(_shared_vector_stores.clear)
+
+
+def init_cassio_session(**init_kwargs: Any) -> tuple[Any, str | None]:
+    """
+    Initializes cassio and returns the session and default keyspace it set up.
+
+    cassio.init replaces a process-wide default session, so initializations are serialized and the new session
+    is read back before another build replaces it. Vector stores given this session explicitly do not pick up
+    the session of a build running concurrently.
+
+    Args:
+        **init_kwargs: The arguments of cassio.init.
+
+    Returns:
+        tuple[Any, str | None]: The Cassandra session and the default keyspace, if any.
+    """
+    import cassio
+    from cassio.config import resolve_keyspace, resolve_session
+
+    with _cassio_init_lock:
+        cassio.init(**init_kwargs)
+        return resolve_session(), resolve_keyspace()
+
+
+def elasticsearch_client_options() -> dict:
+    """
+    Returns the client options shared by the synchronous and asynchronous Elasticsearch clients.
+
+    Bulk helpers serialize every action with the client's JSON serializer, which is the main CPU cost of
+    ingesting long embedding vectors, so orjson is used when elasticsearch-py provides it (8.12+). It also
+    serializes numpy arrays natively.
+    """
+    try:
+        from elasticsearch.serializer import OrjsonSerializer
+    except ImportError:
+        return {}
+    return {"serializer": OrjsonSerializer()}
+
+
+def get_elasticsearch_client(
+    url: str,
+    username: str | None,
+    password: str | None,
+    verify_certs: bool = True,
+    headers: dict[str, str] | None = None,
+):
+    """
+    Returns a shared Elasticsearch client for the given cluster and credentials.
+
+    Clients are shared for the lifetime of the process, so every component built against the same cluster
+    reuses the same pool of keep-alive connections instead of opening new TCP/TLS connections. The urllib3
+    connections already disable Nagle's algorithm (TCP_NODELAY), so small bulk requests are not delayed.
+    At most 16 clients are kept, the least recently used one is closed to make room for a new one.
+
+    Args:
+        url (str): The Elasticsearch cluster url.
+        username (str | None): The username for basic authentication.
+        password (str | None): The password for basic authentication.
+        verify_certs (bool): Whether to verify the cluster's TLS certificate.
+        headers (dict[str, str] | None): Headers sent with every request, such as the user agent.
+
+    Returns:
+        Elasticsearch: The shared client.
+    """
+    from elasticsearch import Elasticsearch
+
+    def build():
+        return Elasticsearch(
+            url,
+            basic_auth=(username, password) if username else None,
+            verify_certs=verify_certs,
+            headers=headers,
+            connections_per_node=25,
+            http_compress=True,
+            request_timeout=30,
+            retry_on_timeout=True,
+            max_retries=3,
+            **elasticsearch_client_options(),
+        )
+
+    # the password is only kept as a digest in the key
+    key = (url, credentials_digest(username, password), verify_certs, tuple(sorted((headers or {}).items())))
+    return _elasticsearch_clients.get_or_build(key, build)
+
+
+_elasticsearch_clients = _SharedRegistry(max_entries=16, close=lambda client: client.close())
+atexit.register(_elasticsearch_clients.clear)
+
+
+class Int8QueryEmbeddings(Embeddings):
+    """Quantizes query embeddings so they can be compared against an index of int8 vectors."""
+
+    def __init__(self, embedding: Embeddings):
+        self.embedding = embedding
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embedding.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return quantize_int8([self.embedding.embed_query(text)])[0].tolist()
+
+
+def _normalize(vector) -> np.ndarray:
+    vec = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class SemanticQueryCache:
+    """
+    LRU cache of search results keyed on query embeddings.
+
+    A lookup hits when a cached query of the same scope has a cosine similarity with the new query above
+    the threshold, given to the lookup or set on the cache, so near-identical queries skip the vector store.
+    A scope is a (store, search) pair of hashable keys: the store key identifies the vector store and is used
+    to invalidate its results after ingestion, the search key holds everything else that changes the results
+    (credentials, embedding model, k, filters). Results expire after ttl_seconds, so writes made by other
+    processes are eventually seen. Recency is tracked per cached query, and the least recently used one is
+    evicted when the cache is full.
+    """
+
+    def __init__(self, max_entries: int = 256, similarity_threshold: float = 0.97, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        # scope -> (normalized query vectors, results, creation times, last use ticks)
+        self._entries: dict[tuple[Hashable, Hashable], tuple[np.ndarray, list[Any], np.ndarray, np.ndarray]] = {}
+        # a logical clock orders the uses, as consecutive monotonic() readings can be equal
+        self._clock = count()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        store_key: Hashable,
+        search_key: Hashable,
+        query_vector,
+        similarity_threshold: float | None = None,
+    ) -> Any | None:
+        if similarity_threshold is None:
+            similarity_threshold = self.similarity_threshold
+        scope = (store_key, search_key)
+        query = _normalize(query_vector)
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is None or entry[0].shape[1] != query.shape[0]:
+                return None
+            matrix, results, created, last_used = entry
+            fresh = time.monotonic() - created < self.ttl_seconds
+            if not fresh.all():
+                matrix, created, last_used = matrix[fresh], created[fresh], last_used[fresh]
+                results = [result for result, is_fresh in zip(results, fresh) if is_fresh]
+                if not results:
+                    del self._entries[scope]
+                    return None
+                self._entries[scope] = (matrix, results, created, last_used)
+
+            similarities = matrix @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < similarity_threshold:
+                return None
+
+            last_used[best] = next(self._clock)
+            return results[best]
+
+    def set(self, store_key: Hashable, search_key: Hashable, query_vector, result: Any) -> None:
+        scope = (store_key, search_key)
+        query = _normalize(query_vector)[None, :]
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is None or entry[0].shape[1] != query.shape[1]:
+                entry = (np.empty((0, query.shape[1]), dtype=np.float32), [], np.empty(0), np.empty(0, dtype=np.int64))
+            matrix, results, created, last_used = entry
+            self._entries[scope] = (
+                np.vstack([matrix, query]),
+                [*results, result],
+                np.append(created, time.monotonic()),
+                np.append(last_used, next(self._clock)),
+            )
+            while sum(len(entry[1]) for entry in self._entries.values()) > self.max_entries:
+                self._evict_least_recently_used()
+
+    def _evict_least_recently_used(self) -> None:
+        scope = min(self._entries, key=lambda scope: self._entries[scope][3].min())
+        matrix, results, created, last_used = self._entries[scope]
+        if len(results) == 1:
+            del self._entries[scope]
+            return
+        oldest = int(np.argmin(last_used))
+        self._entries[scope] = (
+            np.delete(matrix, oldest, axis=0),
+            results[:oldest] + results[oldest + 1 :],
+            np.delete(created, oldest),
+            np.delete(last_used, oldest),
+        )
+
+    def invalidate(self, store_key: Hashable) -> None:
+        with self._lock:
+            for scope in [scope for scope in self._entries if scope[0] == store_key]:
+                del self._entries[scope]
+
+
+def credentials_digest(*credentials: Any) -> str:
+    """Digests credentials so they can be part of a cache key without being kept in memory as is."""
+    return hashlib.blake2b(json.dumps(credentials, default=str).encode(), digest_size=16).hexdigest()
+
+
+# shared by the vector store components, as their module level is not executed when built from code
+semantic_query_cache = SemanticQueryCache()
@@ -1,5 +1,3 @@
-from langchain_community.embeddings import InfinityEmbeddings
-
 from langflow.base.models.model import LCModelComponent
 from langflow.field_typing import Embeddings
 from langflow.io import MessageTextInput, Output
@@ -30,6 +28,8 @@ class InfinityEmbeddingsComponent(LCModelComponent):
     ]
 
     def build_embeddings(self) -> Embeddings:
+        from langchain_community.embeddings import InfinityEmbeddings
+
         try:
             output = InfinityEmbeddings(
                 model=self.model,
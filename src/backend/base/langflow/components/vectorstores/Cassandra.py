@@ -1,9 +1,25 @@
-from typing import List
+import asyncio
+import copy
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List
 
-from langchain_community.vectorstores import Cassandra
 from loguru import logger
 
 from langflow.base.vectorstores.model import LCVectorStoreComponent
+from langflow.base.vectorstores.utils import (
+    batched,
+    credentials_digest,
+    data_to_payloads,
+    embed_documents_cached,
+    embedding_namespace,
+    get_shared_vector_store,
+    init_cassio_session,
+    merge_search_results,
+    semantic_query_cache,
+)
+from langflow.field_typing import VectorStore
 from langflow.helpers.data import docs_to_data
 from langflow.inputs import BoolInput, DictInput, FloatInput
 from langflow.io import (
@@ -16,6 +32,7 @@ from langflow.io import (
     SecretStrInput,
 )
 from langflow.schema import Data
+from langflow.utils.async_helpers import run_until_complete
 
 
 class CassandraVectorStoreComponent(LCVectorStoreComponent):
@@ -25,7 +42,13 @@ class CassandraVectorStoreComponent(LCVectorStoreComponent):
     name = "Cassandra"
     icon = "Cassandra"
 
-    _cached_vectorstore: Cassandra | None = None
+    _cached_vectorstore: VectorStore | None = None
+    _cached_vectorstore_key: tuple | None = None
+    _max_write_retries = 5
+    _ingest_chunk_size = 1000
+    _embed_workers = 2
+    _max_pending_chunks = 4
+    _max_search_workers = 8
 
     inputs = [
         MessageTextInput(
@@ -68,6 +91,13 @@ class CassandraVectorStoreComponent(LCVectorStoreComponent):
             value=16,
             advanced=True,
         ),
+        IntInput(
+            name="max_concurrency",
+            display_name="Max Concurrency",
+            info="Maximum number of batches inserted concurrently.",
+            value=8,
+            advanced=True,
+        ),
         DropdownInput(
             name="setup_mode",
             display_name="Setup Mode",
@@ -84,6 +114,27 @@ class CassandraVectorStoreComponent(LCVectorStoreComponent):
             is_list=True,
         ),
         MultilineInput(name="search_query", display_name="Search Query"),
+        BoolInput(
+            name="split_search_query",
+            display_name="One Query per Line",
+            info="Run each line of the search query as a separate query, in parallel, and merge their results.",
+            value=False,
+            advanced=True,
+        ),
+        BoolInput(
+            name="semantic_cache",
+            display_name="Semantic Cache",
+            info="Reuse the results of an earlier similarity search whose query is close enough to the new one.",
+            value=False,
+            advanced=True,
+        ),
+        FloatInput(
+            name="semantic_cache_threshold",
+            display_name="Semantic Cache Threshold",
+            info="Minimum cosine similarity between two search queries for them to share cached results.",
+            value=0.97,
+            advanced=True,
+        ),
         DataInput(
             name="ingest_data",
             display_name="Ingest Data",
@@ -134,15 +185,81 @@ class CassandraVectorStoreComponent(LCVectorStoreComponent):
         ),
     ]
 
-    def build_vector_store(self) -> Cassandra:
+    def build_vector_store(self) -> VectorStore:
         return self._build_cassandra()
 
-    def _build_cassandra(self) -> Cassandra:
-        if self._cached_vectorstore:
+    def _store_key(self) -> tuple:
+        return ("cassandra", self.database_ref, self.keyspace, self.table_name)
+
+    def _vectorstore_cache_key(self) -> tuple:
+        return (*self._store_key(), id(self.ingest_data))
+
+    def _shared_store_key(self) -> tuple:
+        return (
+            *self._store_key(),
+            credentials_digest(self.username, self.token),
+            json.dumps(self.cluster_kwargs, sort_keys=True, default=str),
+            self.ttl_seconds,
+            self.enable_body_search,
+            self.setup_mode,
+            embedding_namespace(self.embedding),
+        )
+
+    def _build_cassandra(self) -> VectorStore:
+        # cache the vector store so that multiple outputs only ingest the data once
+        cache_key = self._vectorstore_cache_key()
+        if self._cached_vectorstore is not None and self._cached_vectorstore_key == cache_key:
             return self._cached_vectorstore
+
+        from langchain_community.utilities.cassandra import SetupMode
+        from langchain_community.vectorstores import Cassandra
+
+        payloads = data_to_payloads(self.ingest_data or [])
+
+        if self.enable_body_search:
+            body_index_options = [("index_analyzer", "STANDARD")]
+        else:
+            body_index_options = None
+
+        if self.setup_mode == "Off":
+            setup_mode = SetupMode.OFF
+        elif self.setup_mode == "Sync":
+            setup_mode = SetupMode.SYNC
+        else:
+            setup_mode = SetupMode.ASYNC
+
+        def build_table():
+            session, keyspace = self._init_cassio()
+            return Cassandra(
+                embedding=self.embedding,
+                session=session,
+                table_name=self.table_name,
+                keyspace=self.keyspace or keyspace,
+                ttl_seconds=self.ttl_seconds or None,
+                body_index_options=body_index_options,
+                setup_mode=setup_mode,
+            )
+
+        if self.ingest_data:
+            logger.debug(f"Adding {len(self.ingest_data)} documents to the Vector Store.")
+            table = run_until_complete(self._abuild_and_add_documents(build_table, payloads))
+            semantic_query_cache.invalidate(self._store_key())
+        else:
+            logger.debug("No documents to add to the Vector Store.")
+            if embedding_namespace(self.embedding) is None:
+                # the table is created for the embedding's dimension, unknown embeddings get their own table
+                table = build_table()
+            else:
+                # the cassio table keeps the session and its prepared statements, so it is shared across builds
+                table = copy.copy(get_shared_vector_store(self._shared_store_key(), build_table))
+                table.embedding = self.embedding
+        self._cached_vectorstore = table
+        self._cached_vectorstore_key = cache_key
+        return table
+
+    def _init_cassio(self):
         try:
-            import cassio
-            from langchain_community.utilities.cassandra import SetupMode
+            import cassio  # noqa: F401
         except ImportError:
             raise ImportError(
                 "Could not import cassio integration package. " "Please install it with `pip install cassio`."
@@ -162,61 +279,94 @@ class CassandraVectorStoreComponent(LCVectorStoreComponent):
                 database_ref = self.database_ref.split(",")
 
         if is_astra:
-            cassio.init(
+            return init_cassio_session(
                 database_id=database_ref,
                 token=self.token,
                 cluster_kwargs=self.cluster_kwargs,
             )
         else:
-            cassio.init(
+            return init_cassio_session(
                 contact_points=database_ref,
                 username=self.username,
                 password=self.token,
                 cluster_kwargs=self.cluster_kwargs,
             )
-        documents = []
 
-        for _input in self.ingest_data or []:
-            if isinstance(_input, Data):
-                documents.append(_input.to_lc_document())
-            else:
-                documents.append(_input)
+    async def _abuild_and_add_documents(
+        self, build_table: Callable[[], VectorStore], payloads: Iterable[tuple[str, dict]]
+    ) -> VectorStore:
+        # built inside the ingestion event loop, so that an async schema setup runs on this loop and overlaps
+        # the first embedding request. cassio's async writes wait for the setup to finish.
+        table = build_table()
+        await self._aadd_documents(table, payloads)
+        return table
 
-        if self.enable_body_search:
-            body_index_options = [("index_analyzer", "STANDARD")]
-        else:
-            body_index_options = None
+    async def _aadd_documents(self, table: VectorStore, payloads: Iterable[tuple[str, dict]]) -> None:
+        from cassandra import WriteTimeout
 
-        if self.setup_mode == "Off":
-            setup_mode = SetupMode.OFF
-        elif self.setup_mode == "Sync":
-            setup_mode = SetupMode.SYNC
-        else:
-            setup_mode = SetupMode.ASYNC
+        # every row is its own write, the batch size and concurrency bound the writes in flight
+        batch_size = self.batch_size or 16
+        semaphore = asyncio.Semaphore(self.max_concurrency or 8)
+        ttl_seconds = self.ttl_seconds or None
 
-        if documents:
-            logger.debug(f"Adding {len(documents)} documents to the Vector Store.")
-            table = Cassandra.from_documents(
-                documents=documents,
-                embedding=self.embedding,
-                table_name=self.table_name,
-                keyspace=self.keyspace,
-                ttl_seconds=self.ttl_seconds or None,
-                batch_size=self.batch_size,
-                body_index_options=body_index_options,
-            )
-        else:
-            logger.debug("No documents to add to the Vector Store.")
-            table = Cassandra(
-                embedding=self.embedding,
-                table_name=self.table_name,
-                keyspace=self.keyspace,
-                ttl_seconds=self.ttl_seconds or None,
-                body_index_options=body_index_options,
-                setup_mode=setup_mode,
-            )
-        self._cached_vectorstore = table
-        return table
+        async def put_batch(batch: list) -> None:
+            async with semaphore:
+                for attempt in range(self._max_write_retries):
+                    try:
+                        # cassio reuses its prepared INSERT, so each row is a single bound execution
+                        await asyncio.gather(
+                            *(
+                                table.table.aput(
+                                    row_id=row_id,
+                                    body_blob=text,
+                                    vector=vector.tolist(),
+                                    metadata=metadata,
+                                    ttl_seconds=ttl_seconds,
+                                )
+                                for row_id, text, vector, metadata in batch
+                            )
+                        )
+                        return
+                    except WriteTimeout:
+                        # rows are keyed by their fixed ids, so rewriting the batch is idempotent
+                        if attempt == self._max_write_retries - 1:
+                            raise
+                        logger.debug(f"Write timeout while adding documents, retrying (attempt {attempt + 1}).")
+                        await asyncio.sleep(2**attempt)
+
+        loop = asyncio.get_running_loop()
+        embed_pool = ThreadPoolExecutor(max_workers=self._embed_workers)
+        # chunks being embedded or written at the same time, so memory stays bounded
+        pending_chunks = asyncio.Semaphore(self._max_pending_chunks)
+
+        async def embed_and_put(chunk: list) -> None:
+            try:
+                texts, metadatas = map(list, zip(*chunk))
+                # a single embedding request for the chunk's documents not embedded before, instead of one per
+                # batch, returned as one float32 array whose rows are only converted to lists when bound
+                vectors = await loop.run_in_executor(embed_pool, embed_documents_cached, self.embedding, texts)
+                rows = list(zip([uuid.uuid4().hex for _ in texts], texts, vectors, metadatas))
+                await asyncio.gather(*(put_batch(batch) for batch in batched(rows, batch_size)))
+            finally:
+                pending_chunks.release()
+
+        # the embedding of the next chunks overlaps the writes of the previous ones
+        tasks: list[asyncio.Task] = []
+        try:
+            for chunk in batched(payloads, self._ingest_chunk_size):
+                await pending_chunks.acquire()
+                for task in [task for task in tasks if task.done()]:
+                    # stop reading documents as soon as a chunk failed
+                    task.result()
+                    tasks.remove(task)
+                tasks.append(asyncio.ensure_future(embed_and_put(chunk)))
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            embed_pool.shutdown(wait=False)
 
     def _map_search_type(self):
         if self.search_type == "Similarity with score threshold":
@@ -229,18 +379,24 @@ class CassandraVectorStoreComponent(LCVectorStoreComponent):
     def search_documents(self) -> List[Data]:
         vector_store = self._build_cassandra()
 
-        logger.debug(f"Search input: {self.search_query}")
+        queries = self._search_queries()
+        logger.debug(f"Search input: {queries}")
         logger.debug(f"Search type: {self.search_type}")
         logger.debug(f"Number of results: {self.number_of_results}")
 
-        if self.search_query and isinstance(self.search_query, str) and self.search_query.strip():
+        if queries:
             try:
                 search_type = self._map_search_type()
                 search_args = self._build_search_args()
 
                 logger.debug(f"Search args: {str(search_args)}")
 
-                docs = vector_store.search(query=self.search_query, search_type=search_type, **search_args)
+                if len(queries) > 1:
+                    docs = self._multi_search(vector_store, queries, search_type, search_args)
+                elif search_type == "similarity":
+                    docs = self._similarity_search_cached(vector_store, queries[0], search_args)
+                else:
+                    docs = vector_store.search(query=queries[0], search_type=search_type, **search_args)
             except KeyError as e:
                 if "content" in str(e):
                     raise ValueError(
@@ -257,6 +413,66 @@ class CassandraVectorStoreComponent(LCVectorStoreComponent):
         else:
             return []
 
+    def _search_queries(self) -> list[str]:
+        if isinstance(self.search_query, list):
+            queries = self.search_query
+        elif isinstance(self.search_query, str):
+            queries = self.search_query.splitlines() if self.split_search_query else [self.search_query]
+        else:
+            queries = []
+        return [query for query in queries if isinstance(query, str) and query.strip()]
+
+    def _multi_search(self, vector_store: VectorStore, queries: list[str], search_type: str, search_args: dict) -> list:
+        with ThreadPoolExecutor(max_workers=min(len(queries), self._max_search_workers)) as executor:
+            if search_type == "similarity":
+                query_vectors = list(executor.map(vector_store.embedding.embed_query, queries))
+                results = executor.map(
+                    lambda query_vector: vector_store.similarity_search_with_score_by_vector(
+                        query_vector,
+                        k=search_args["k"],
+                        filter=search_args.get("filter"),
+                        body_search=search_args.get("body_search"),
+                    ),
+                    query_vectors,
+                )
+                return merge_search_results(results, search_args["k"])
+
+            # the other search types have no comparable scores, keep the results of each query in turn
+            results = executor.map(
+                lambda query: vector_store.search(query=query, search_type=search_type, **search_args), queries
+            )
+            docs = {doc.page_content: doc for query_docs in results for doc in query_docs}
+        return list(docs.values())
+
+    def _similarity_search_cached(self, vector_store: VectorStore, query: str, search_args: dict) -> list:
+        query_vector = vector_store.embedding.embed_query(query)
+        namespace = embedding_namespace(vector_store.embedding)
+        # results are only shared between builds authenticating with the same credentials
+        search_key = (
+            credentials_digest(self.username, self.token),
+            namespace,
+            json.dumps(search_args, sort_keys=True, default=str),
+        )
+
+        use_cache = self.semantic_cache and namespace is not None
+        if use_cache:
+            docs = semantic_query_cache.get(
+                self._store_key(), search_key, query_vector, similarity_threshold=self.semantic_cache_threshold
+            )
+            if docs is not None:
+                logger.debug("Reusing the results of a semantically similar search query.")
+                return docs
+
+        docs = vector_store.similarity_search_by_vector(
+            query_vector,
+            k=search_args["k"],
+            filter=search_args.get("filter"),
+            body_search=search_args.get("body_search"),
+        )
+        if use_cache:
+            semantic_query_cache.set(self._store_key(), search_key, query_vector, docs)
+        return docs
+
     def _build_search_args(self):
         args = {
             "k": self.number_of_results,
@@ -1,12 +1,40 @@
-from datetime import timedelta
-from typing import List
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List
 
-from langchain_community.vectorstores import ElasticVectorSearch
+from langchain_core.documents import Document
+from loguru import logger
 
 from langflow.base.vectorstores.model import LCVectorStoreComponent
+from langflow.base.vectorstores.utils import (
+    Int8QueryEmbeddings,
+    adaptive_batch_size,
+    batched,
+    credentials_digest,
+    data_to_payloads,
+    embed_documents_cached,
+    elasticsearch_client_options,
+    embedding_namespace,
+    get_elasticsearch_client,
+    merge_search_results,
+    quantize_int8,
+    semantic_query_cache,
+)
+from langflow.field_typing import VectorStore
 from langflow.helpers.data import docs_to_data
-from langflow.io import HandleInput, IntInput, StrInput, SecretStrInput, DataInput, MultilineInput
+from langflow.io import (
+    BoolInput,
+    DataInput,
+    FloatInput,
+    HandleInput,
+    IntInput,
+    MultilineInput,
+    SecretStrInput,
+    StrInput,
+)
 from langflow.schema import Data
+from langflow.utils.async_helpers import run_until_complete
 
 
 class ElasticsearchVectorStoreComponent(LCVectorStoreComponent):
@@ -16,6 +44,12 @@ class ElasticsearchVectorStoreComponent(LCVectorStoreComponent):
     name = "Elasticsearch"
     icon = "Redis"
 
+    _cached_vectorstore: VectorStore | None = None
+    _cached_vectorstore_key: tuple | None = None
+    _bulk_chunk_size = 1000
+    _bulk_concurrency = 4
+    _max_search_workers = 8
+
     inputs = [
         StrInput(
             name="elasticsearch_url", display_name="Elasticsearch Cluster url", required=True
@@ -24,6 +58,27 @@ class ElasticsearchVectorStoreComponent(LCVectorStoreComponent):
         SecretStrInput(name="elasticsearch_password", display_name="Elasticsearch password", required=True),
         StrInput(name="index_name", display_name="Index Name", required=True),
         MultilineInput(name="search_query", display_name="Search Query"),
+        BoolInput(
+            name="split_search_query",
+            display_name="One Query per Line",
+            info="Run each line of the search query as a separate query, in parallel, and merge their results.",
+            value=False,
+            advanced=True,
+        ),
+        BoolInput(
+            name="semantic_cache",
+            display_name="Semantic Cache",
+            info="Reuse the results of an earlier similarity search whose query is close enough to the new one.",
+            value=False,
+            advanced=True,
+        ),
+        FloatInput(
+            name="semantic_cache_threshold",
+            display_name="Semantic Cache Threshold",
+            info="Minimum cosine similarity between two search queries for them to share cached results.",
+            value=0.97,
+            advanced=True,
+        ),
         DataInput(
             name="ingest_data",
             display_name="Ingest Data",
@@ -37,50 +92,286 @@ class ElasticsearchVectorStoreComponent(LCVectorStoreComponent):
             value=4,
             advanced=True,
         ),
+        IntInput(
+            name="max_batch_bytes",
+            display_name="Max Batch Bytes",
+            info="Maximum payload of a single bulk request. The number of documents per request is sized from "
+            "the length of the documents to stay under it.",
+            value=10 * 1024 * 1024,
+            advanced=True,
+        ),
+        BoolInput(
+            name="verify_certs",
+            display_name="Verify TLS Certificates",
+            info="Verify the TLS certificate of the Elasticsearch cluster. "
+            "Only disable it for clusters using self-signed certificates.",
+            value=True,
+            advanced=True,
+        ),
+        BoolInput(
+            name="int8_quantize",
+            display_name="Int8 Quantization",
+            info="Store vectors as int8 byte vectors (Elasticsearch 8.6+), 4x smaller than float vectors. "
+            "This must be enabled BEFORE the index is created.",
+            value=False,
+            advanced=True,
+        ),
     ]
 
-    def build_vector_store(self) -> ElasticVectorSearch:
+    def build_vector_store(self) -> VectorStore:
         return self._build_elasticsearch()
 
-    def _build_elasticsearch(self) -> ElasticVectorSearch:
-        documents = []
-        for _input in self.ingest_data or []:
-            if isinstance(_input, Data):
-                documents.append(_input.to_lc_document())
-            else:
-                documents.append(_input)
-
-        if documents:
-            elasticsearch_vs = ElasticVectorSearch.from_documents(
-                elasticsearch_url=self.elasticsearch_url,
-                http_auth=(self.elasticsearch_username, self.elasticsearch_password),
-                verify_certs=False,
-                documents=documents,
-                embedding=self.embedding,
-                index_name=self.index_name,
-            )
+    def _store_key(self) -> tuple:
+        return ("elasticsearch", self.elasticsearch_url, self.index_name)
+
+    def _vectorstore_cache_key(self) -> tuple:
+        return (
+            *self._store_key(),
+            self.elasticsearch_username,
+            self.verify_certs,
+            self.int8_quantize,
+            id(self.ingest_data),
+        )
+
+    def _build_elasticsearch(self) -> VectorStore:
+        # cache the vector store so that multiple outputs only ingest the data once
+        cache_key = self._vectorstore_cache_key()
+        if self._cached_vectorstore is not None and self._cached_vectorstore_key == cache_key:
+            return self._cached_vectorstore
+
+        from langchain_community.vectorstores import ElasticVectorSearch
+
+        payloads = data_to_payloads(self.ingest_data or [])
+
+        elasticsearch_vs = ElasticVectorSearch(
+            elasticsearch_url=self.elasticsearch_url,
+            embedding=Int8QueryEmbeddings(self.embedding) if self.int8_quantize else self.embedding,
+            index_name=self.index_name,
+        )
+        # reuse the pooled connections to the cluster instead of the client the store created, keeping its
+        # user agent. The store's own client has not connected yet, closing it releases its connection pool.
+        store_client = elasticsearch_vs.client
+        elasticsearch_vs.client = get_elasticsearch_client(
+            self.elasticsearch_url,
+            self.elasticsearch_username,
+            self.elasticsearch_password,
+            self.verify_certs,
+            headers={"user-agent": ElasticVectorSearch.get_user_agent()},
+        )
+        store_client.close()
+
+        if self.ingest_data:
+            logger.debug(f"Adding {len(self.ingest_data)} documents to the Vector Store.")
+            self._add_documents(elasticsearch_vs, payloads)
+            semantic_query_cache.invalidate(self._store_key())
         else:
-            elasticsearch_vs = ElasticVectorSearch(
-                elasticsearch_url=self.elasticsearch_url,
-                http_auth=(self.elasticsearch_username, self.elasticsearch_password),
-                verify_certs=False,
-                embedding=self.embedding,
-                index_name=self.index_name,
-            )
+            logger.debug("No documents to add to the Vector Store.")
 
+        self._cached_vectorstore = elasticsearch_vs
+        self._cached_vectorstore_key = cache_key
         return elasticsearch_vs
 
+    def _add_documents(self, vector_store: VectorStore, payloads: Iterable[tuple[str, dict]]) -> None:
+        from elasticsearch.helpers import bulk
+
+        # documents are consumed in chunks so only one chunk of vectors is held in memory at a time
+        chunks = (
+            self._bulk_actions(vector_store, chunk)
+            for chunk in batched(payloads, self._bulk_chunk_size * self._bulk_concurrency)
+        )
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            # AsyncElasticsearch needs the aiohttp transport, index synchronously without it
+            for actions in chunks:
+                bulk(
+                    vector_store.client,
+                    actions,
+                    chunk_size=self._bulk_request_size(actions),
+                    max_chunk_bytes=self._max_batch_bytes(),
+                )
+        else:
+            run_until_complete(self._abulk_index(chunks))
+        vector_store.client.indices.refresh(index=self.index_name)
+
+    def _bulk_actions(self, vector_store: VectorStore, payloads: list[tuple[str, dict]]) -> list:
+        texts, metadatas = map(list, zip(*payloads))
+        # a single embedding request for the chunk's documents not embedded before
+        vectors = embed_documents_cached(self.embedding, texts)
+        if self.int8_quantize:
+            vectors = quantize_int8(vectors)
+        self._ensure_index(vector_store, vectors.shape[1])
+
+        # the rows are serialized straight from the float32 (or int8) array, without boxing every value
+        return [
+            {
+                "_op_type": "index",
+                "_index": self.index_name,
+                "_id": str(uuid.uuid4()),
+                "text": text,
+                "vector": vector,
+                "metadata": metadata,
+            }
+            for text, vector, metadata in zip(texts, vectors, metadatas)
+        ]
+
+    def _max_batch_bytes(self) -> int:
+        return self.max_batch_bytes or 10 * 1024 * 1024
+
+    def _bulk_request_size(self, actions: list) -> int:
+        # vectors are serialized as JSON numbers, about 12 bytes per float and 5 per int8 value
+        dims = len(actions[0]["vector"]) if actions else 0
+        bytes_per_dim = 5 if self.int8_quantize else 12
+        return adaptive_batch_size(
+            [action["text"] for action in actions[:32]],
+            self._max_batch_bytes(),
+            row_overhead_bytes=dims * bytes_per_dim,
+            max_size=self._bulk_chunk_size,
+        )
+
+    def _ensure_index(self, vector_store: VectorStore, dims: int) -> None:
+        from elasticsearch.exceptions import NotFoundError
+
+        try:
+            vector_store.client.indices.get(index=self.index_name)
+        except NotFoundError:
+            vector_mapping = {"type": "dense_vector", "dims": dims}
+            if self.int8_quantize:
+                vector_mapping["element_type"] = "byte"
+            mapping = {"properties": {"text": {"type": "text"}, "vector": vector_mapping}}
+            vector_store.create_index(vector_store.client, self.index_name, mapping)
+
+    async def _abulk_index(self, chunks: Iterable[list]) -> None:
+        from elasticsearch import AsyncElasticsearch
+        from elasticsearch.helpers import async_bulk
+
+        # a single client, and so a single connection pool, for the whole ingestion
+        client = AsyncElasticsearch(
+            self.elasticsearch_url,
+            basic_auth=(self.elasticsearch_username, self.elasticsearch_password),
+            verify_certs=self.verify_certs,
+            connections_per_node=self._bulk_concurrency,
+            http_compress=True,
+            retry_on_timeout=True,
+            max_retries=3,
+            **elasticsearch_client_options(),
+        ).options(request_timeout=60)
+        try:
+            for actions in chunks:
+                # disjoint slices of the actions are sent concurrently, each in its own sequence of bulk requests
+                slice_size = -(-len(actions) // self._bulk_concurrency)
+                chunk_size = self._bulk_request_size(actions)
+                tasks = [
+                    asyncio.ensure_future(
+                        async_bulk(
+                            client,
+                            actions[i : i + slice_size],
+                            chunk_size=chunk_size,
+                            max_chunk_bytes=self._max_batch_bytes(),
+                        )
+                    )
+                    for i in range(0, len(actions), slice_size)
+                ]
+                try:
+                    await asyncio.gather(*tasks)
+                except BaseException:
+                    # the other slices are still sending on the client: stop them before it is closed
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+        finally:
+            await client.close()
+
     def search_documents(self) -> List[Data]:
         vector_store = self._build_elasticsearch()
 
-        if self.search_query and isinstance(self.search_query, str) and self.search_query.strip():
-            docs = vector_store.similarity_search(
-                query=self.search_query,
-                k=self.number_of_results,
-            )
+        queries = self._search_queries()
+        if queries:
+            if len(queries) > 1:
+                docs = self._multi_search(vector_store, queries)
+            else:
+                docs = self._similarity_search_cached(vector_store, queries[0])
 
             data = docs_to_data(docs)
             self.status = data
             return data
         else:
             return []
+
+    def _search_queries(self) -> list[str]:
+        if isinstance(self.search_query, list):
+            queries = self.search_query
+        elif isinstance(self.search_query, str):
+            queries = self.search_query.splitlines() if self.split_search_query else [self.search_query]
+        else:
+            queries = []
+        return [query for query in queries if isinstance(query, str) and query.strip()]
+
+    def _script_query(self, query_vector: list) -> dict:
+        # same scoring as ElasticVectorSearch.similarity_search
+        return {
+            "script_score": {
+                "query": {"match_all": {}},
+                "script": {
+                    "source": "cosineSimilarity(params.query_vector, 'vector') + 1.0",
+                    "params": {"query_vector": query_vector},
+                },
+            }
+        }
+
+    def _multi_search(self, vector_store: VectorStore, queries: list[str]) -> list:
+        # the store's embedding quantizes the queries when the index holds int8 vectors
+        with ThreadPoolExecutor(max_workers=min(len(queries), self._max_search_workers)) as executor:
+            query_vectors = list(executor.map(vector_store.embedding.embed_query, queries))
+
+        # a single round trip for all the queries
+        searches = []
+        for query_vector in query_vectors:
+            searches.append({"index": self.index_name})
+            searches.append({"query": self._script_query(query_vector), "size": self.number_of_results})
+        responses = vector_store.client.msearch(searches=searches)["responses"]
+
+        results = []
+        for response in responses:
+            if "error" in response:
+                raise ValueError(f"Error searching Elasticsearch: {response['error']}")
+            results.append(
+                [
+                    (Document(page_content=hit["_source"]["text"], metadata=hit["_source"]["metadata"]), hit["_score"])
+                    for hit in response["hits"]["hits"]
+                ]
+            )
+        return merge_search_results(results, self.number_of_results)
+
+    def _similarity_search_cached(self, vector_store: VectorStore, query: str) -> list:
+        # the store's embedding quantizes the query when the index holds int8 vectors
+        query_vector = vector_store.embedding.embed_query(query)
+        namespace = embedding_namespace(self.embedding)
+        # results are only shared between builds authenticating with the same credentials
+        search_key = (
+            credentials_digest(self.elasticsearch_username, self.elasticsearch_password),
+            namespace,
+            self.int8_quantize,
+            self.number_of_results,
+        )
+
+        use_cache = self.semantic_cache and namespace is not None
+        if use_cache:
+            docs = semantic_query_cache.get(
+                self._store_key(), search_key, query_vector, similarity_threshold=self.semantic_cache_threshold
+            )
+            if docs is not None:
+                logger.debug("Reusing the results of a semantically similar search query.")
+                return docs
+
+        response = vector_store.client_search(
+            vector_store.client, self.index_name, self._script_query(query_vector), size=self.number_of_results
+        )
+        docs = [
+            Document(page_content=hit["_source"]["text"], metadata=hit["_source"]["metadata"])
+            for hit in response["hits"]["hits"]
+        ]
+        if use_cache:
+            semantic_query_cache.set(self._store_key(), search_key, query_vector, docs)
+        return docs
@@ -0,0 +1,71 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _sift_down(heap_scores, heap_indices, pos, size):
+    while True:
+        left = 2 * pos + 1
+        if left >= size:
+            break
+        smallest = left
+        right = left + 1
+        if right < size and heap_scores[right] < heap_scores[left]:
+            smallest = right
+        if heap_scores[smallest] >= heap_scores[pos]:
+            break
+        heap_scores[pos], heap_scores[smallest] = heap_scores[smallest], heap_scores[pos]
+        heap_indices[pos], heap_indices[smallest] = heap_indices[smallest], heap_indices[pos]
+        pos = smallest
+
+
+def _topk_heap(scores, k):
+    # min-heap holding the k best scores seen so far, its root is the one to evict
+    heap_scores = np.empty(k, dtype=np.float64)
+    heap_indices = np.empty(k, dtype=np.int64)
+    for i in range(k):
+        heap_scores[i] = scores[i]
+        heap_indices[i] = i
+    for pos in range(k // 2 - 1, -1, -1):
+        _sift_down(heap_scores, heap_indices, pos, k)
+
+    for i in range(k, scores.shape[0]):
+        if scores[i] > heap_scores[0]:
+            heap_scores[0] = scores[i]
+            heap_indices[0] = i
+            _sift_down(heap_scores, heap_indices, 0, k)
+
+    order = np.argsort(-heap_scores)
+    return heap_indices[order]
+
+
+if njit is not None:
+    _sift_down = njit(cache=True)(_sift_down)
+    _topk_heap = njit(cache=True)(_topk_heap)
+
+
+def topk(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Selects the indices of the k highest scores, best first.
+
+    Uses a numba-compiled partial heap selection when numba is installed, and numpy's argpartition otherwise.
+
+    Args:
+        scores (np.ndarray): One-dimensional array of scores.
+        k (int): Number of indices to select.
+
+    Returns:
+        np.ndarray: The indices of the k highest scores, sorted by descending score.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if njit is not None:
+        return _topk_heap(scores, k)
+
+    indices = np.argpartition(-scores, k - 1)[:k]
+    return indices[np.argsort(-scores[indices])]
@@ -0,0 +1,18 @@
+from langflow.base.vectorstores.utils import adaptive_batch_size
+
+
+def test_short_texts_get_large_batches():
+    assert adaptive_batch_size(["short"] * 100, max_batch_bytes=5 * 1024 * 1024) == 1000
+
+
+def test_long_texts_get_small_batches():
+    assert adaptive_batch_size(["x" * 100_000] * 100, max_batch_bytes=5 * 1024 * 1024) == 52
+    assert adaptive_batch_size(["x" * 10_000_000], max_batch_bytes=5 * 1024 * 1024) == 8
+
+
+def test_row_overhead_is_counted():
+    assert adaptive_batch_size(["x" * 1000], max_batch_bytes=100_000, row_overhead_bytes=9000) == 10
+
+
+def test_empty_texts():
+    assert adaptive_batch_size([], max_batch_bytes=1024) == 8
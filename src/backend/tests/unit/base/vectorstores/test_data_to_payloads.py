@@ -0,0 +1,31 @@
+import pytest
+from langchain_core.documents import Document
+from langflow.base.vectorstores.utils import data_to_payloads
+from langflow.schema import Data
+
+
+def test_data_payload_matches_lc_document():
+    data = Data(text_key="content", data={"content": "hello", "source": "a.txt"})
+
+    [(text, metadata)] = data_to_payloads([data])
+
+    document = data.to_lc_document()
+    assert (text, metadata) == (document.page_content, document.metadata)
+    assert data.data == {"content": "hello", "source": "a.txt"}
+
+
+def test_documents_and_data_subclasses():
+    class CustomData(Data):
+        def to_lc_document(self) -> Document:
+            return Document(page_content=self.get_text().upper(), metadata={"custom": True})
+
+    inputs = [Document(page_content="doc", metadata={"page": 1}), CustomData(data={"text": "custom"})]
+
+    assert list(data_to_payloads(inputs)) == [("doc", {"page": 1}), ("CUSTOM", {"custom": True})]
+
+
+def test_data_text_is_validated():
+    assert list(data_to_payloads([Data(data={"text": 42})])) == [("42", {})]
+
+    with pytest.raises(ValueError, match="must be a string"):
+        list(data_to_payloads([Data(data={"source": "a.txt"}, default_value=None)]))
@@ -0,0 +1,96 @@
+from typing import ClassVar
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_core.pydantic_v1 import BaseModel
+from langflow.base.vectorstores import utils
+from langflow.base.vectorstores.utils import embed_documents_cached
+
+
+def _vector(text):
+    return [float(len(text)), float(sum(map(ord, text)) % 97), 0.5]
+
+
+class CountingEmbeddings(BaseModel, Embeddings):
+    model: str = "counting"
+    calls: ClassVar[list] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [_vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return _vector(text)
+
+
+class UnidentifiedEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [_vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return _vector(text)
+
+
+@pytest.fixture(autouse=True)
+def embeddings_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "EMBEDDINGS_CACHE_DIR", tmp_path / "embeddings")
+    monkeypatch.setattr(utils, "_embeddings_cache", None)
+    CountingEmbeddings.calls.clear()
+    yield tmp_path / "embeddings"
+    if utils._embeddings_cache is not None:
+        utils._embeddings_cache.close()
+
+
+def test_duplicate_texts_are_embedded_once():
+    embedding = CountingEmbeddings()
+
+    vectors = embed_documents_cached(embedding, ["a", "bb", "a", "ccc", "bb"])
+
+    assert CountingEmbeddings.calls == [["a", "bb", "ccc"]]
+    assert vectors.dtype == np.float32
+    assert vectors.flags.c_contiguous
+    assert vectors.tolist() == [_vector(text) for text in ["a", "bb", "a", "ccc", "bb"]]
+
+
+def test_cached_texts_are_not_embedded_again(embeddings_cache):
+    embed_documents_cached(CountingEmbeddings(), ["a", "bb"])
+    CountingEmbeddings.calls.clear()
+
+    vectors = embed_documents_cached(CountingEmbeddings(), ["bb", "a"])
+
+    assert CountingEmbeddings.calls == []
+    assert vectors.dtype == np.float32
+    assert vectors.tolist() == [_vector("bb"), _vector("a")]
+    assert embeddings_cache.exists()
+
+
+def test_only_new_texts_are_embedded():
+    embed_documents_cached(CountingEmbeddings(), ["a"])
+
+    embed_documents_cached(CountingEmbeddings(), ["a", "bb"])
+
+    assert CountingEmbeddings.calls == [["a"], ["bb"]]
+
+
+def test_unidentified_embeddings_skip_the_disk_cache(embeddings_cache):
+    embedding = UnidentifiedEmbeddings()
+
+    first = embed_documents_cached(embedding, ["a", "bb", "a"])
+    second = embed_documents_cached(embedding, ["a", "bb", "a"])
+
+    assert embedding.calls == [["a", "bb"], ["a", "bb"]]
+    assert first.dtype == np.float32
+    assert first.flags.c_contiguous
+    assert first.tolist() == second.tolist() == [_vector("a"), _vector("bb"), _vector("a")]
+    assert utils._embeddings_cache is None
+    assert not embeddings_cache.exists()
+
+
+def test_no_texts():
+    assert embed_documents_cached(CountingEmbeddings(), []).shape == (0, 0)
+    assert CountingEmbeddings.calls == []
@@ -0,0 +1,38 @@
+from langchain_core.embeddings import Embeddings, FakeEmbeddings
+from langchain_core.pydantic_v1 import BaseModel, SecretStr
+from langflow.base.vectorstores.utils import embedding_namespace
+
+
+class ConfiguredEmbeddings(BaseModel, Embeddings):
+    model: str = "text-embedding-3-small"
+    dimensions: int | None = None
+    api_key: SecretStr | None = None
+
+    def embed_documents(self, texts):
+        return [[0.0] for _ in texts]
+
+    def embed_query(self, text):
+        return [0.0]
+
+
+class UnidentifiedEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[0.0] for _ in texts]
+
+    def embed_query(self, text):
+        return [0.0]
+
+
+def test_configuration_changes_namespace():
+    assert embedding_namespace(FakeEmbeddings(size=512)) != embedding_namespace(FakeEmbeddings(size=1536))
+    assert embedding_namespace(ConfiguredEmbeddings()) != embedding_namespace(ConfiguredEmbeddings(dimensions=512))
+
+
+def test_secrets_do_not_change_namespace():
+    assert embedding_namespace(ConfiguredEmbeddings(api_key="first")) == embedding_namespace(
+        ConfiguredEmbeddings(api_key="second")
+    )
+
+
+def test_unidentified_embeddings_have_no_namespace():
+    assert embedding_namespace(UnidentifiedEmbeddings()) is None
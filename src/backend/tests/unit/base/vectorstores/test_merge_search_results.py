@@ -0,0 +1,17 @@
+from langchain_core.documents import Document
+from langflow.base.vectorstores.utils import merge_search_results
+
+
+def test_merge_keeps_best_distinct_documents():
+    first = [(Document(page_content="a"), 0.9), (Document(page_content="b"), 0.5)]
+    second = [(Document(page_content="b"), 0.8), (Document(page_content="c"), 0.7)]
+
+    docs = merge_search_results([first, second], k=2)
+
+    assert [doc.page_content for doc in docs] == ["a", "b"]
+
+
+def test_merge_with_fewer_results_than_k():
+    docs = merge_search_results([[(Document(page_content="a"), 0.1)], []], k=4)
+
+    assert [doc.page_content for doc in docs] == ["a"]
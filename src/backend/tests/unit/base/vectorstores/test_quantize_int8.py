@@ -0,0 +1,57 @@
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langflow.base.vectorstores.utils import Int8QueryEmbeddings, quantize_int8
+
+
+class FixedEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[0.25, -0.5, 1.0] for _ in texts]
+
+    def embed_query(self, text):
+        return [0.25, -0.5, 1.0]
+
+
+def _cosine(a, b):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return a @ b / (np.linalg.norm(a) * np.linalg.norm(b))
+
+
+def test_zero_vectors_stay_zero():
+    quantized = quantize_int8([[0.0, 0.0, 0.0], [1.0, -2.0, 0.5]])
+
+    assert quantized.dtype == np.int8
+    assert quantized[0].tolist() == [0, 0, 0]
+
+
+def test_values_stay_within_symmetric_range():
+    vectors = np.random.default_rng(0).normal(size=(50, 64)) * 1000
+
+    quantized = quantize_int8(vectors).astype(np.int16)
+
+    assert quantized.min() >= -127
+    assert quantized.max() <= 127
+    # each vector's largest magnitude maps to the end of the range
+    assert (np.abs(quantized).max(axis=1) == 127).all()
+
+
+def test_cosine_ranking_is_preserved():
+    rng = np.random.default_rng(1)
+    query = rng.normal(size=128)
+    documents = rng.normal(size=(20, 128))
+
+    quantized_query = quantize_int8([query])[0]
+    quantized_documents = quantize_int8(documents)
+
+    expected = np.argsort([-_cosine(query, document) for document in documents])
+    ranked = np.argsort([-_cosine(quantized_query, document) for document in quantized_documents])
+    assert ranked.tolist() == expected.tolist()
+
+
+def test_query_embeddings_are_ints():
+    embedding = Int8QueryEmbeddings(FixedEmbeddings())
+
+    vector = embedding.embed_query("query")
+
+    assert vector == [32, -64, 127]
+    assert all(type(value) is int for value in vector)
+    assert embedding.embed_documents(["document"]) == [[0.25, -0.5, 1.0]]
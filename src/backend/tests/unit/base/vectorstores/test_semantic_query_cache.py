@@ -0,0 +1,70 @@
+from langflow.base.vectorstores.utils import SemanticQueryCache
+
+
+def test_hit_on_similar_query():
+    cache = SemanticQueryCache(similarity_threshold=0.97)
+    cache.set("store", "search", [1.0, 0.0], ["result"])
+
+    assert cache.get("store", "search", [2.0, 0.01]) == ["result"]
+    assert cache.get("store", "search", [0.0, 1.0]) is None
+
+
+def test_scopes_are_isolated():
+    cache = SemanticQueryCache()
+    cache.set("store", "search", [1.0, 0.0], ["result"])
+
+    assert cache.get("other_store", "search", [1.0, 0.0]) is None
+    assert cache.get("store", "other_search", [1.0, 0.0]) is None
+    assert cache.get("store", "search", [1.0, 0.0, 0.0]) is None
+
+
+def test_invalidate_store():
+    cache = SemanticQueryCache()
+    cache.set("store", "search", [1.0, 0.0], ["result"])
+    cache.set("other_store", "search", [1.0, 0.0], ["other"])
+
+    cache.invalidate("store")
+
+    assert cache.get("store", "search", [1.0, 0.0]) is None
+    assert cache.get("other_store", "search", [1.0, 0.0]) == ["other"]
+
+
+def test_evicts_least_recently_used():
+    cache = SemanticQueryCache(max_entries=2)
+    cache.set("store", "search", [1.0, 0.0], ["first"])
+    cache.set("store", "search", [0.0, 1.0], ["second"])
+    assert cache.get("store", "search", [1.0, 0.0]) == ["first"]
+
+    cache.set("store", "search", [-1.0, 0.0], ["third"])
+
+    assert cache.get("store", "search", [0.0, 1.0]) is None
+    assert cache.get("store", "search", [1.0, 0.0]) == ["first"]
+    assert cache.get("store", "search", [-1.0, 0.0]) == ["third"]
+
+
+def test_entries_expire():
+    cache = SemanticQueryCache(ttl_seconds=0)
+    cache.set("store", "search", [1.0, 0.0], ["result"])
+
+    assert cache.get("store", "search", [1.0, 0.0]) is None
+
+
+def test_threshold_per_lookup():
+    cache = SemanticQueryCache(similarity_threshold=0.97)
+    cache.set("store", "search", [1.0, 0.0], ["result"])
+
+    assert cache.get("store", "search", [1.0, 0.5]) is None
+    assert cache.get("store", "search", [1.0, 0.5], similarity_threshold=0.8) == ["result"]
+
+
+def test_evicts_least_recently_used_across_scopes():
+    cache = SemanticQueryCache(max_entries=2)
+    cache.set("store", "search", [1.0, 0.0], ["first"])
+    cache.set("other_store", "search", [1.0, 0.0], ["second"])
+    assert cache.get("store", "search", [1.0, 0.0]) == ["first"]
+
+    cache.set("store", "search", [0.0, 1.0], ["third"])
+
+    assert cache.get("other_store", "search", [1.0, 0.0]) is None
+    assert cache.get("store", "search", [1.0, 0.0]) == ["first"]
+    assert cache.get("store", "search", [0.0, 1.0]) == ["third"]
@@ -0,0 +1,108 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from langflow.base.vectorstores.utils import _SharedRegistry, _shutdown_session
+
+
+def test_builds_each_key_once():
+    registry = _SharedRegistry(max_entries=4, close=lambda value: None)
+    built = []
+
+    def build():
+        built.append("value")
+        return object()
+
+    first = registry.get_or_build("key", build)
+
+    assert registry.get_or_build("key", build) is first
+    assert built == ["value"]
+
+
+def test_evicts_and_closes_least_recently_used():
+    closed = []
+    registry = _SharedRegistry(max_entries=2, close=closed.append)
+    registry.get_or_build("first", lambda: "first value")
+    registry.get_or_build("second", lambda: "second value")
+    registry.get_or_build("first", lambda: "unused")
+
+    registry.get_or_build("third", lambda: "third value")
+
+    assert closed == ["second value"]
+    assert registry.get_or_build("first", lambda: "unused") == "first value"
+    assert registry.get_or_build("second", lambda: "rebuilt") == "rebuilt"
+
+
+def test_failed_build_is_not_kept():
+    registry = _SharedRegistry(max_entries=2, close=lambda value: None)
+
+    def fail():
+        raise ConnectionError("unreachable")
+
+    with pytest.raises(ConnectionError):
+        registry.get_or_build("key", fail)
+
+    assert registry.get_or_build("key", lambda: "value") == "value"
+
+
+def test_clear_closes_everything():
+    closed = []
+    registry = _SharedRegistry(max_entries=2, close=closed.append)
+    registry.get_or_build("first", lambda: "first value")
+    registry.get_or_build("second", lambda: "second value")
+
+    registry.clear()
+
+    assert sorted(closed) == ["first value", "second value"]
+
+
+def test_keys_build_concurrently():
+    registry = _SharedRegistry(max_entries=4, close=lambda value: None)
+    started = threading.Event()
+
+    def build_first():
+        # waits for the other key's build, which a registry-wide lock would block
+        assert started.wait(timeout=5)
+        return "first value"
+
+    def build_second():
+        started.set()
+        return "second value"
+
+    thread = threading.Thread(target=registry.get_or_build, args=("first", build_first))
+    thread.start()
+    assert registry.get_or_build("second", build_second) == "second value"
+    thread.join(timeout=5)
+
+    assert registry.get_or_build("first", lambda: "unused") == "first value"
+
+
+def test_same_key_is_built_once_concurrently():
+    registry = _SharedRegistry(max_entries=4, close=lambda value: None)
+    release = threading.Event()
+    built = []
+
+    def build():
+        built.append("value")
+        release.wait(timeout=5)
+        return "value"
+
+    threads = [threading.Thread(target=registry.get_or_build, args=("key", build)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert built == ["value"]
+
+
+def test_shutdown_session_shuts_down_the_cluster():
+    calls = []
+    cluster = SimpleNamespace(shutdown=lambda: calls.append("cluster"))
+    session = SimpleNamespace(cluster=cluster, shutdown=lambda: calls.append("session"))
+
+    _shutdown_session(SimpleNamespace(session=session))
+    _shutdown_session(SimpleNamespace(session=None))
+
+    assert calls == ["cluster"]
@@ -0,0 +1,165 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from langflow.components.vectorstores.Cassandra import CassandraVectorStoreComponent
+
+cassandra = pytest.importorskip("cassandra")
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class StubCassioTable:
+    """Stands in for the cassio table of a Cassandra vector store, `put` is called for every aput."""
+
+    def __init__(self, put=None):
+        self.rows = []
+        self._put = put
+
+    async def aput(self, **row):
+        if self._put is not None:
+            await self._put(row)
+        self.rows.append(row)
+
+
+def _component(**attributes):
+    component = CassandraVectorStoreComponent()
+    component.set_attributes({"embedding": LengthEmbeddings(), "batch_size": 2, "max_concurrency": 2, **attributes})
+    return component
+
+
+def _payloads(texts, read):
+    for text in texts:
+        read.append(text)
+        yield text, {"source": text}
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(CassandraVectorStoreComponent, "_ingest_chunk_size", 1)
+    monkeypatch.setattr(CassandraVectorStoreComponent, "_max_pending_chunks", 2)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", record_sleep)
+    return delays
+
+
+@pytest.mark.asyncio
+async def test_rows_carry_text_vector_metadata_and_ttl():
+    table = StubCassioTable()
+
+    await _component(ttl_seconds=60)._aadd_documents(SimpleNamespace(table=table), _payloads(["a", "bb", "ccc"], []))
+
+    rows = sorted(table.rows, key=lambda row: row["body_blob"])
+    assert [row["body_blob"] for row in rows] == ["a", "bb", "ccc"]
+    assert [row["vector"] for row in rows] == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert [row["metadata"] for row in rows] == [{"source": "a"}, {"source": "bb"}, {"source": "ccc"}]
+    assert {row["ttl_seconds"] for row in rows} == {60}
+    assert len({row["row_id"] for row in rows}) == 3
+
+
+@pytest.mark.asyncio
+async def test_pending_chunks_are_bounded(small_chunks):
+    release = asyncio.Event()
+    started = []
+
+    async def wait_for_release(row):
+        started.append(row["body_blob"])
+        await release.wait()
+
+    table = StubCassioTable(wait_for_release)
+    read = []
+    texts = [f"text {i}" for i in range(6)]
+    ingestion = asyncio.ensure_future(
+        _component()._aadd_documents(SimpleNamespace(table=table), _payloads(texts, read))
+    )
+
+    while len(started) < 2:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    # two chunks are being written, the third one is read but waits for one of them to finish
+    assert sorted(started) == texts[:2]
+    assert read == texts[:3]
+
+    release.set()
+    await ingestion
+    assert sorted(row["body_blob"] for row in table.rows) == texts
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_chunks_in_flight_and_stops_reading(small_chunks):
+    cancelled = []
+    slow_started = asyncio.Event()
+
+    async def fail_or_hang(row):
+        if row["body_blob"] == "bad":
+            await slow_started.wait()
+            raise RuntimeError("write failed")
+        slow_started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(row["body_blob"])
+            raise
+
+    read = []
+    texts = ["slow", "bad", *(f"text {i}" for i in range(10))]
+
+    with pytest.raises(RuntimeError, match="write failed"):
+        table = SimpleNamespace(table=StubCassioTable(fail_or_hang))
+        await asyncio.wait_for(_component()._aadd_documents(table, _payloads(texts, read)), timeout=5)
+    await asyncio.sleep(0.05)
+
+    assert cancelled == ["slow"]
+    assert read == texts[:3]
+
+
+@pytest.mark.asyncio
+async def test_write_timeouts_are_retried_with_backoff(sleeps):
+    attempts = []
+
+    async def time_out_twice(row):
+        attempts.append(row["row_id"])
+        if len(attempts) <= 2:
+            raise cassandra.WriteTimeout("write timed out")
+
+    table = StubCassioTable(time_out_twice)
+
+    await _component(batch_size=1)._aadd_documents(SimpleNamespace(table=table), _payloads(["a"], []))
+
+    assert sleeps == [1, 2]
+    # the same row is written again, so a retry does not duplicate it
+    assert len(set(attempts)) == 1
+    assert [row["body_blob"] for row in table.rows] == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_write_timeouts_give_up_after_the_last_retry(sleeps, monkeypatch):
+    monkeypatch.setattr(CassandraVectorStoreComponent, "_max_write_retries", 3)
+
+    async def time_out(row):
+        raise cassandra.WriteTimeout("write timed out")
+
+    with pytest.raises(cassandra.WriteTimeout):
+        await _component(batch_size=1)._aadd_documents(
+            SimpleNamespace(table=StubCassioTable(time_out)), _payloads(["a"], [])
+        )
+
+    assert sleeps == [1, 2]
@@ -0,0 +1,47 @@
+import inspect
+from types import SimpleNamespace
+
+import pytest
+
+from langflow.components.vectorstores.Cassandra import CassandraVectorStoreComponent
+from langflow.components.vectorstores.Elasticsearch import ElasticsearchVectorStoreComponent
+from langflow.utils.validate import create_class
+
+
+@pytest.mark.parametrize("component_class", [CassandraVectorStoreComponent, ElasticsearchVectorStoreComponent])
+def test_component_builds_from_its_source(component_class):
+    # components are rebuilt from their source code, which only runs the imports and the class body
+    code = inspect.getsource(inspect.getmodule(component_class))
+
+    component = create_class(code, component_class.__name__)()
+
+    assert {input_.name for input_ in component.inputs} == {input_.name for input_ in component_class.inputs}
+
+
+class IndexRecorder:
+    def __init__(self):
+        self.created = []
+        self.client = SimpleNamespace(indices=SimpleNamespace(get=self._get))
+
+    def _get(self, index):
+        from elasticsearch.exceptions import NotFoundError
+
+        raise NotFoundError("index_not_found_exception", None, {})
+
+    def create_index(self, client, index_name, mapping):
+        self.created.append((index_name, mapping))
+
+
+@pytest.mark.parametrize("int8_quantize, element_type", [(True, "byte"), (False, None)])
+def test_elasticsearch_index_mapping_matches_quantization(int8_quantize, element_type):
+    pytest.importorskip("elasticsearch")
+    component = ElasticsearchVectorStoreComponent()
+    component.set_attributes({"index_name": "langflow", "int8_quantize": int8_quantize})
+    vector_store = IndexRecorder()
+
+    component._ensure_index(vector_store, 4)
+
+    [(index_name, mapping)] = vector_store.created
+    assert index_name == "langflow"
+    assert mapping["properties"]["vector"]["dims"] == 4
+    assert mapping["properties"]["vector"].get("element_type") == element_type
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from langflow.utils import topk_numba
+from langflow.utils.topk_numba import topk
+
+
+@pytest.mark.parametrize("k", [0, 1, 3, 10, 20])
+def test_topk_matches_full_sort(k):
+    scores = np.random.default_rng(0).random(10)
+    expected = np.argsort(-scores)[:k]
+    assert topk(scores, k).tolist() == expected.tolist()
+
+
+def test_topk_accepts_lists():
+    assert topk([0.1, 0.9, 0.5, 0.7], 2).tolist() == [1, 3]
+
+
+def _plain(function):
+    # the uncompiled function when numba is installed, so the heap is tested the same way either way
+    return getattr(function, "py_func", function)
+
+
+@pytest.mark.parametrize("k", [1, 2, 5, 9, 10])
+def test_topk_heap_matches_full_sort(k):
+    scores = np.random.default_rng(1).random(10)
+    expected = np.argsort(-scores)[:k]
+    assert _plain(topk_numba._topk_heap)(scores, k).tolist() == expected.tolist()
+
+
+def test_topk_heap_keeps_tied_scores():
+    scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1, 0.5])
+    selected = _plain(topk_numba._topk_heap)(scores, 3)
+    assert sorted(selected[:2].tolist()) == [1, 3]
+    assert selected[2] in (0, 2, 5)
+
+
+def test_sift_down_restores_min_heap():
+    heap_scores = np.array([0.9, 0.2, 0.4, 0.3, 0.5])
+    heap_indices = np.arange(5)
+    _plain(topk_numba._sift_down)(heap_scores, heap_indices, 0, 5)
+    assert heap_scores.tolist() == [0.2, 0.3, 0.4, 0.9, 0.5]
+    assert heap_indices.tolist() == [1, 3, 2, 0, 4]
+
+
+def test_topk_falls_back_to_argpartition(monkeypatch):
+    monkeypatch.setattr(topk_numba, "njit", None)
+    scores = np.random.default_rng(2).random(10)
+    assert topk(scores, 4).tolist() == np.argsort(-scores)[:4].tolist()